@@ -0,0 +1,25 @@
+-- Migrate staging_events UUID columns from CHAR/VARCHAR(36) to BINARY(16)
+-- Required before running src/loader.py, which sends these ids as 16 raw bytes.
+-- MySQL 8.0+ (UUID_TO_BIN, RENAME COLUMN). Re-create any indexes or keys
+-- defined on these columns after running.
+
+USE ecommerce_staging;
+
+ALTER TABLE staging_events
+    ADD COLUMN event_id_bin BINARY(16) NULL,
+    ADD COLUMN session_id_bin BINARY(16) NULL,
+    ADD COLUMN order_id_bin BINARY(16) NULL;
+
+-- Convert existing rows (UUID_TO_BIN(NULL) is NULL)
+UPDATE staging_events
+SET event_id_bin = UUID_TO_BIN(event_id),
+    session_id_bin = UUID_TO_BIN(session_id),
+    order_id_bin = UUID_TO_BIN(order_id);
+
+ALTER TABLE staging_events
+    DROP COLUMN event_id,
+    DROP COLUMN session_id,
+    DROP COLUMN order_id,
+    RENAME COLUMN event_id_bin TO event_id,
+    RENAME COLUMN session_id_bin TO session_id,
+    RENAME COLUMN order_id_bin TO order_id;
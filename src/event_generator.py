@@ -1,83 +1,265 @@
 from faker import Faker
-import json
-import random
+import uuid
 from datetime import datetime, timedelta
 import os
+import sys
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:
+    import json
+    orjson = None
+
+# Load environment variables
+load_dotenv()
 
 fake = Faker()
 
-def generate_page_view():
-    """Generate a page view event"""
-    categories = ['electronics', 'clothing', 'books', 'home', 'sports', 'toys']
-    return {
-        'event_type': 'page_view',
-        'event_id': fake.uuid4(),
-        'user_id': random.randint(1000, 9999),
-        'session_id': fake.uuid4(),
-        'timestamp': datetime.now().isoformat(),
-        'page_url': f'/products/{random.choice(categories)}/{fake.uri_page()}',
-        'device': random.choice(['mobile', 'desktop', 'tablet']),
-        'browser': random.choice(['Chrome', 'Firefox', 'Safari', 'Edge'])
-    }
+# Worker processes used to generate events
+GENERATOR_WORKERS = os.cpu_count() or 1
+
+# Events per generated chunk; each chunk has its own seed, so chunking (and
+# therefore the output for a given seed) never depends on the worker count.
+# Large enough to be worth the process start and pickling cost.
+CHUNK_SIZE = 50_000
+
+# Default PCG64 generator for batch generators called in-process
+_RNG = np.random.default_rng()
 
-def generate_add_to_cart():
-    """Generate add to cart event"""
+# Categorical values sampled by the batch generators
+_CATEGORIES = np.array(['electronics', 'clothing', 'books', 'home', 'sports', 'toys'])
+_DEVICES = np.array(['mobile', 'desktop', 'tablet'])
+_BROWSERS = np.array(['Chrome', 'Firefox', 'Safari', 'Edge'])
+_PAYMENT_METHODS = np.array(['credit_card', 'paypal', 'debit_card', 'apple_pay'])
+_BOOLS = np.array([True, False])
+
+# Pre-drawn Faker string pools, sampled with rng.choice instead of per-event calls
+POOL_SIZE = 1000
+_POOLS = None
+
+def build_string_pools(seed=None, size=POOL_SIZE):
+    """Draw the Faker string pools, seeding the module's Faker instance if a seed is given"""
+    if seed is not None:
+        fake.seed_instance(int(np.random.default_rng(seed).integers(0, 2**31)))
     return {
-        'event_type': 'add_to_cart',
-        'event_id': fake.uuid4(),
-        'user_id': random.randint(1000, 9999),
-        'session_id': fake.uuid4(),
-        'timestamp': datetime.now().isoformat(),
-        'product_id': random.randint(100, 999),
-        'product_name': fake.catch_phrase(),
-        'price': round(random.uniform(10.0, 500.0), 2),
-        'quantity': random.randint(1, 3)
+        'uri_pages': np.array([fake.uri_page() for _ in range(size)]),
+        'product_names': np.array([fake.catch_phrase() for _ in range(size)]),
+        'cities': np.array([fake.city() for _ in range(size)]),
+        'states': np.array([fake.state_abbr() for _ in range(size)]),
+        'zips': np.array([fake.zipcode() for _ in range(size)]),
+        'sentences': np.array([fake.sentence(nb_words=10) for _ in range(size)]),
     }
 
-def generate_purchase():
-    """Generate a purchase transaction"""
-    num_items = random.randint(1, 5)
-    item_total = sum([round(random.uniform(10.0, 200.0), 2) for _ in range(num_items)])
+def get_string_pools():
+    """Return the current string pools, drawing them on first use"""
+    global _POOLS
+    if _POOLS is None:
+        _POOLS = build_string_pools()
+    return _POOLS
+
+def init_worker(pools):
+    """Install string pools drawn once by the parent process"""
+    global _POOLS
+    _POOLS = pools
+
+def generate_uuids(n, rng):
+    """Generate n version-4 UUID strings from the given RNG stream"""
+    raw = rng.bytes(16 * n)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * n, 16)]
+
+def generate_timestamps(n):
+    """Generate n ISO timestamps spaced 1ms apart from a single clock read"""
+    base = datetime.now()
+    return [(base + timedelta(milliseconds=i)).isoformat() for i in range(n)]
+
+def generate_page_views(n, rng=_RNG):
+    """Generate a batch of page view events"""
+    pools = get_string_pools()
+    user_ids = rng.integers(1000, 10000, n).tolist()
+    cats = rng.choice(_CATEGORIES, n).tolist()
+    devices = rng.choice(_DEVICES, n).tolist()
+    browsers = rng.choice(_BROWSERS, n).tolist()
+    uri_pages = rng.choice(pools['uri_pages'], n).tolist()
+    event_ids = generate_uuids(n, rng)
+    session_ids = generate_uuids(n, rng)
+    timestamps = generate_timestamps(n)
     
-    return {
-        'event_type': 'purchase',
-        'event_id': fake.uuid4(),
-        'order_id': fake.uuid4(),
-        'user_id': random.randint(1000, 9999),
-        'timestamp': datetime.now().isoformat(),
-        'total_amount': round(item_total, 2),
-        'items_count': num_items,
-        'payment_method': random.choice(['credit_card', 'paypal', 'debit_card', 'apple_pay']),
-        'shipping_address': {
-            'city': fake.city(),
-            'state': fake.state_abbr(),
-            'zip': fake.zipcode()
+    return [
+        {
+            'event_type': 'page_view',
+            'event_id': event_id,
+            'user_id': user_id,
+            'session_id': session_id,
+            'timestamp': timestamp,
+            'page_url': f'/products/{category}/{uri_page}',
+            'device': device,
+            'browser': browser
         }
-    }
+        for event_id, session_id, user_id, category, device, browser, uri_page, timestamp in zip(
+            event_ids, session_ids, user_ids, cats, devices, browsers, uri_pages, timestamps)
+    ]
 
-def generate_product_review():
-    """Generate a product review event"""
-    return {
-        'event_type': 'product_review',
-        'event_id': fake.uuid4(),
-        'user_id': random.randint(1000, 9999),
-        'product_id': random.randint(100, 999),
-        'timestamp': datetime.now().isoformat(),
-        'rating': random.randint(1, 5),
-        'review_text': fake.sentence(nb_words=10),
-        'verified_purchase': random.choice([True, False])
-    }
+def generate_add_to_carts(n, rng=_RNG):
+    """Generate a batch of add to cart events"""
+    pools = get_string_pools()
+    user_ids = rng.integers(1000, 10000, n).tolist()
+    product_ids = rng.integers(100, 1000, n).tolist()
+    prices = rng.uniform(10.0, 500.0, n).round(2).tolist()
+    quantities = rng.integers(1, 4, n).tolist()
+    product_names = rng.choice(pools['product_names'], n).tolist()
+    event_ids = generate_uuids(n, rng)
+    session_ids = generate_uuids(n, rng)
+    timestamps = generate_timestamps(n)
+    
+    return [
+        {
+            'event_type': 'add_to_cart',
+            'event_id': event_id,
+            'user_id': user_id,
+            'session_id': session_id,
+            'timestamp': timestamp,
+            'product_id': product_id,
+            'product_name': product_name,
+            'price': price,
+            'quantity': quantity
+        }
+        for event_id, session_id, user_id, product_id, price, quantity, product_name, timestamp in zip(
+            event_ids, session_ids, user_ids, product_ids, prices, quantities, product_names, timestamps)
+    ]
+
+def generate_purchases(n, rng=_RNG):
+    """Generate a batch of purchase transactions"""
+    pools = get_string_pools()
+    nums = rng.integers(1, 6, n)
+    
+    # Draw every item price at once, then sum each purchase's segment
+    prices = rng.uniform(10.0, 200.0, nums.sum()).round(2)
+    purchase_idx = np.repeat(np.arange(n), nums)
+    item_totals = np.bincount(purchase_idx, weights=prices, minlength=n).round(2).tolist()
+    nums = nums.tolist()
+    user_ids = rng.integers(1000, 10000, n).tolist()
+    payment_methods = rng.choice(_PAYMENT_METHODS, n).tolist()
+    cities = rng.choice(pools['cities'], n).tolist()
+    states = rng.choice(pools['states'], n).tolist()
+    zips = rng.choice(pools['zips'], n).tolist()
+    event_ids = generate_uuids(n, rng)
+    order_ids = generate_uuids(n, rng)
+    timestamps = generate_timestamps(n)
+    
+    return [
+        {
+            'event_type': 'purchase',
+            'event_id': event_id,
+            'order_id': order_id,
+            'user_id': user_id,
+            'timestamp': timestamp,
+            'total_amount': item_total,
+            'items_count': num_items,
+            'payment_method': payment_method,
+            'shipping_address': {
+                'city': city,
+                'state': state,
+                'zip': zip_code
+            }
+        }
+        for event_id, order_id, user_id, item_total, num_items, payment_method, city, state, zip_code, timestamp in zip(
+            event_ids, order_ids, user_ids, item_totals, nums, payment_methods, cities, states, zips, timestamps)
+    ]
+
+def generate_product_reviews(n, rng=_RNG):
+    """Generate a batch of product review events"""
+    pools = get_string_pools()
+    user_ids = rng.integers(1000, 10000, n).tolist()
+    product_ids = rng.integers(100, 1000, n).tolist()
+    ratings = rng.integers(1, 6, n).tolist()
+    verified = rng.choice(_BOOLS, n).tolist()
+    review_texts = rng.choice(pools['sentences'], n).tolist()
+    event_ids = generate_uuids(n, rng)
+    timestamps = generate_timestamps(n)
+    
+    return [
+        {
+            'event_type': 'product_review',
+            'event_id': event_id,
+            'user_id': user_id,
+            'product_id': product_id,
+            'timestamp': timestamp,
+            'rating': rating,
+            'review_text': review_text,
+            'verified_purchase': verified_purchase
+        }
+        for event_id, user_id, product_id, rating, verified_purchase, review_text, timestamp in zip(
+            event_ids, user_ids, product_ids, ratings, verified, review_texts, timestamps)
+    ]
+
+# Events generated per run: (label, batch generator, count)
+EVENT_TYPES = [
+    ('Page views', generate_page_views, 100),
+    ('Add to cart', generate_add_to_carts, 30),
+    ('Purchases', generate_purchases, 20),
+    ('Reviews', generate_product_reviews, 15),
+]
+
+def generate_chunk(task):
+    """Run one batch generator in a worker process with its own RNG stream"""
+    generator, n, seed = task
+    return generator(n, np.random.default_rng(seed))
+
+def generate_events(workers=GENERATOR_WORKERS, seed=None):
+    """Generate all event types in fixed-size chunks, spread across worker processes
+    
+    Each event type is cut into CHUNK_SIZE chunks with one spawned seed per
+    chunk; workers only decides how chunks are spread across processes, so
+    the same seed reproduces the same events (apart from timestamps) on any
+    machine. Runs with a single chunk per type stay in-process. seed=None
+    draws fresh entropy.
+    """
+    tasks = []
+    for _, generator, count in EVENT_TYPES:
+        for start in range(0, count, CHUNK_SIZE):
+            tasks.append((generator, min(CHUNK_SIZE, count - start)))
+    
+    # Spawn independent child seeds so worker streams never overlap
+    pool_seed, shuffle_seed, *chunk_seeds = np.random.SeedSequence(seed).spawn(len(tasks) + 2)
+    seeded_tasks = [task + (chunk_seed,) for task, chunk_seed in zip(tasks, chunk_seeds)]
+    
+    # Draw the string pools once here; small runs need no more strings than events
+    total = sum(count for _, _, count in EVENT_TYPES)
+    pools = build_string_pools(pool_seed, min(POOL_SIZE, max(total, 1)))
+    
+    events = []
+    if workers > 1 and len(tasks) > len(EVENT_TYPES):
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=init_worker, initargs=(pools,)) as executor:
+            for batch in executor.map(generate_chunk, seeded_tasks):
+                events.extend(batch)
+    else:
+        init_worker(pools)
+        for task in seeded_tasks:
+            events.extend(generate_chunk(task))
+    
+    # Shuffle events to make them more realistic
+    np.random.default_rng(shuffle_seed).shuffle(events)
+    return events
 
 def save_events(events, filename='events'):
-    """Save events to JSON file"""
+    """Save events to a JSON Lines file (one event per line)"""
     output_dir = 'data/events'
     os.makedirs(output_dir, exist_ok=True)
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filepath = f'{output_dir}/{filename}_{timestamp}.json'
+    filepath = f'{output_dir}/{filename}_{timestamp}.jsonl'
     
-    with open(filepath, 'w') as f:
-        json.dump(events, f, indent=2)
+    if orjson is not None:
+        option = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+        lines = [orjson.dumps(event, option=option) for event in events]
+    else:
+        lines = [(json.dumps(event, separators=(',', ':')) + '\n').encode('utf-8') for event in events]
+    
+    with open(filepath, 'wb') as f:
+        f.writelines(lines)
     
     print(f'[SUCCESS] Saved {len(events)} events to {filepath}')
     return filepath
@@ -88,27 +270,22 @@ def main():
     print('E-COMMERCE EVENT GENERATOR')
     print('=' * 60)
     
-    events = []
+    # Seed for reproducible runs (GENERATOR_SEED); fresh entropy when unset
+    seed = os.getenv('GENERATOR_SEED')
+    if seed:
+        try:
+            seed = int(seed)
+        except ValueError:
+            seed = -1
+        if seed < 0:
+            print(f'[ERROR] GENERATOR_SEED must be a non-negative integer, got {os.getenv("GENERATOR_SEED")!r}')
+            sys.exit(1)
+    else:
+        seed = np.random.SeedSequence().entropy
     
     # Generate different types of events
-    print('Generating page view events...')
-    for _ in range(100):
-        events.append(generate_page_view())
-    
-    print('Generating add-to-cart events...')
-    for _ in range(30):
-        events.append(generate_add_to_cart())
-    
-    print('Generating purchase events...')
-    for _ in range(20):
-        events.append(generate_purchase())
-    
-    print('Generating product reviews...')
-    for _ in range(15):
-        events.append(generate_product_review())
-    
-    # Shuffle events to make them more realistic
-    random.shuffle(events)
+    print(f'Generating events with seed {seed} (up to {GENERATOR_WORKERS} worker processes)...')
+    events = generate_events(seed=seed)
     
     # Save to file
     print('\nSaving events to file...')
@@ -117,10 +294,8 @@ def main():
     print('\n' + '=' * 60)
     print(f'[COMPLETE] Generated {len(events)} total events')
     print(f'Breakdown:')
-    print(f'  - Page views: 100')
-    print(f'  - Add to cart: 30')
-    print(f'  - Purchases: 20')
-    print(f'  - Reviews: 15')
+    for label, _, count in EVENT_TYPES:
+        print(f'  - {label}: {count}')
     print('=' * 60)
     print(f'\nFile location: {filepath}')
     print('Ready for next step: Loading into MySQL!')
@@ -1,126 +1,378 @@
 """Data Loader 
-Loads JSON events from files into MySQL staging tables
+Loads JSON / JSON Lines events from files into MySQL staging tables
 """
 
-import json
+import ijson
 import os
-import pymysql
-from datetime import datetime
+import queue
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+# Prefer mysqlclient (C extension); fall back to pure-Python PyMySQL
+try:
+    import MySQLdb as db_driver
+except ImportError:
+    import pymysql as db_driver
+
+try:
+    import orjson as json_lib
+except ImportError:
+    import json as json_lib
+
 # Load environment variables
 load_dotenv()
 
+# Session settings applied for the duration of a bulk load (they end with the connection)
+BULK_SESSION_SETTINGS = {
+    'unique_checks': 0,
+    'foreign_key_checks': 0,
+    'autocommit': 0,
+    'bulk_insert_buffer_size': 256 * 1024 * 1024,
+}
+
+# Settings that need SUPER / SYSTEM_VARIABLES_ADMIN; skipped if not permitted
+PRIVILEGED_SESSION_SETTINGS = {
+    'sql_log_bin': 0,
+}
+
+# Upper bound on packet / multi-row statement size sent to the server
+MAX_ALLOWED_PACKET = 64 * 1024 * 1024
+
+def configure_bulk_session(connection):
+    """Relax per-row checks and binary logging on the staging session for bulk loading"""
+    with connection.cursor() as cursor:
+        for name, value in BULK_SESSION_SETTINGS.items():
+            cursor.execute(f'SET SESSION {name}={value}')
+        for name, value in PRIVILEGED_SESSION_SETTINGS.items():
+            try:
+                cursor.execute(f'SET SESSION {name}={value}')
+            except Exception as e:
+                print(f'[WARNING] Could not set {name}={value}: {e}')
+
+def get_max_stmt_length(connection):
+    """Largest multi-row statement this connection may send, capped by the server's packet limit"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT @@max_allowed_packet')
+        server_limit = int(cursor.fetchone()[0])
+    # Leave room for the packet header and command byte
+    return min(server_limit, MAX_ALLOWED_PACKET) - 1024
+
 def get_db_connection():
     """Create database connection"""
     try:
-        connection = pymysql.connect(
+        connect_args = dict(
             host=os.getenv('DB_HOST', 'localhost'),
             port=int(os.getenv('DB_PORT', 3306)),
             user=os.getenv('DB_USER', 'root'),
             password=os.getenv('DB_PASSWORD', ''),
             database=os.getenv('DB_NAME_STAGING', 'ecommerce_staging'),
             charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
+            autocommit=False,
+            local_infile=LOCAL_INFILE
         )
+        # libmysqlclient already allows 1GB packets; PyMySQL defaults to 16MB
+        if db_driver.__name__ == 'pymysql':
+            connect_args['max_allowed_packet'] = MAX_ALLOWED_PACKET
+        connection = db_driver.connect(**connect_args)
+        configure_bulk_session(connection)
+        connection.max_stmt_length = get_max_stmt_length(connection)
         print('[SUCCESS] Connected to MySQL database')
         return connection
     except Exception as e:
         print(f'[ERROR] Could not connect to database: {e}')
         return None
 
-def insert_event(cursor, event):
-    """Insert a single event into staging table"""
-    
-    # Parse timestamp
-    timestamp = datetime.fromisoformat(event['timestamp'])
-    
-    # Base fields for all events
-    sql = """
-        INSERT INTO staging_events (
-            event_id, event_type, user_id, session_id, timestamp,
-            page_url, device, browser,
-            product_id, product_name, price, quantity,
-            order_id, total_amount, items_count, payment_method,
-            shipping_city, shipping_state, shipping_zip,
-            rating, review_text, verified_purchase
-        ) VALUES (
-            %s, %s, %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s, %s, %s,
-            %s, %s, %s,
-            %s, %s, %s
-        )
-    """
+INSERT_SQL = """
+    INSERT INTO staging_events (
+        event_id, event_type, user_id, session_id, timestamp,
+        page_url, device, browser,
+        product_id, product_name, price, quantity,
+        order_id, total_amount, items_count, payment_method,
+        shipping_city, shipping_state, shipping_zip,
+        rating, review_text, verified_purchase
+    ) VALUES (
+        %s, %s, %s, %s, %s,
+        %s, %s, %s,
+        %s, %s, %s, %s,
+        %s, %s, %s, %s,
+        %s, %s, %s,
+        %s, %s, %s
+    )
+"""
+
+# Bulk load with LOAD DATA LOCAL INFILE (server needs local_infile=ON);
+# set LOADER_LOCAL_INFILE=0 to always use batched INSERTs
+LOCAL_INFILE = os.getenv('LOADER_LOCAL_INFILE', '1') == '1'
+
+# Errors meaning LOCAL INFILE is disabled: 1148/3948 server side, 2068 client side
+LOCAL_INFILE_DISABLED_ERRORS = {1148, 2068, 3948}
+
+LOAD_DATA_SQL = """
+    LOAD DATA LOCAL INFILE %s
+    INTO TABLE staging_events
+    CHARACTER SET utf8mb4
+    FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+    LINES TERMINATED BY '\\n'
+    (
+        @event_id, event_type, user_id, @session_id, timestamp,
+        page_url, device, browser,
+        product_id, product_name, price, quantity,
+        @order_id, total_amount, items_count, payment_method,
+        shipping_city, shipping_state, shipping_zip,
+        rating, review_text, verified_purchase
+    )
+    SET event_id = UNHEX(@event_id),
+        session_id = UNHEX(@session_id),
+        order_id = UNHEX(@order_id)
+"""
+
+# Characters escaped in LOAD DATA fields
+TSV_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+# Files loaded concurrently, each on its own connection
+LOADER_WORKERS = int(os.getenv('LOADER_WORKERS', 4))
+
+# Rows parsed per batch; in INSERT mode, rows sent per executemany() call
+# (the driver packs them into one multi-row INSERT)
+BATCH_SIZE = 5000
+
+def uuid_to_bytes(value):
+    """Convert a UUID string to its 16-byte form for BINARY(16) columns"""
+    if value is None:
+        return None
+    return uuid.UUID(value).bytes
+
+def event_to_row(event):
+    """Build the staging_events value tuple for a single event"""
+    
+    # Bind event.get once; it is called for almost every column below
+    g = event.get
+    
+    # ISO timestamps only need the 'T' separator swapped for MySQL DATETIME
+    timestamp = event['timestamp'].replace('T', ' ')
     
     # Extract shipping address if exists
-    shipping = event.get('shipping_address', {})
+    shipping = g('shipping_address', {})
     
-    values = (
-        event.get('event_id'),
-        event.get('event_type'),
-        event.get('user_id'),
-        event.get('session_id'),
+    return (
+        uuid_to_bytes(g('event_id')),
+        g('event_type'),
+        g('user_id'),
+        uuid_to_bytes(g('session_id')),
         timestamp,
-        event.get('page_url'),
-        event.get('device'),
-        event.get('browser'),
-        event.get('product_id'),
-        event.get('product_name'),
-        event.get('price'),
-        event.get('quantity'),
-        event.get('order_id'),
-        event.get('total_amount'),
-        event.get('items_count'),
-        event.get('payment_method'),
+        g('page_url'),
+        g('device'),
+        g('browser'),
+        g('product_id'),
+        g('product_name'),
+        g('price'),
+        g('quantity'),
+        uuid_to_bytes(g('order_id')),
+        g('total_amount'),
+        g('items_count'),
+        g('payment_method'),
         shipping.get('city'),
         shipping.get('state'),
         shipping.get('zip'),
-        event.get('rating'),
-        event.get('review_text'),
-        event.get('verified_purchase')
+        g('rating'),
+        g('review_text'),
+        g('verified_purchase')
     )
+
+def row_to_tsv(row):
+    """Format a staging row as a LOAD DATA line (tab-separated, \\N for NULL)"""
+    fields = []
+    append = fields.append
+    escapes = TSV_ESCAPES
+    for value in row:
+        if value is None:
+            append('\\N')
+        elif isinstance(value, bytes):
+            append(value.hex())
+        elif isinstance(value, bool):
+            append('1' if value else '0')
+        else:
+            append(str(value).translate(escapes))
+    return '\t'.join(fields) + '\n'
+
+def iter_events(f, filepath):
+    """Iterate raw events from an open file with their parser
     
-    cursor.execute(sql, values)
+    .jsonl files yield one unparsed line per event so a malformed line can be
+    counted on its own; JSON arrays are parsed incrementally by ijson.
+    """
+    if filepath.endswith('.jsonl'):
+        return (line for line in f if line.strip()), json_lib.loads
+    return ijson.items(f, 'item', use_float=True), None
 
-def load_json_file(filepath, connection):
-    """Load events from a JSON file into database"""
+def read_row_batches(filepath, counts):
+    """Stream events from a JSON file as batches of staging rows"""
+    rows = []
+    append = rows.append
+    to_row = event_to_row
     
-    print(f'\nLoading file: {filepath}')
+    with open(filepath, 'rb') as f:
+        events, parse = iter_events(f, filepath)
+        for idx, event in enumerate(events, 1):
+            counts['events'] = idx
+            try:
+                if parse is not None:
+                    event = parse(event)
+                append(to_row(event))
+            except Exception as e:
+                counts['errors'] += 1
+                print(f'  [ERROR] Failed to parse event {idx}: {e}')
+            
+            if len(rows) >= BATCH_SIZE:
+                yield rows
+                rows = []
+                append = rows.append
+    
+    if rows:
+        yield rows
+
+def insert_rows(connection, cursor, filepath, counts):
+    """Insert events with batched multi-row INSERTs, returning the loaded count"""
+    success_count = 0
     
-    # Read JSON file
-    with open(filepath, 'r') as f:
-        events = json.load(f)
+    # Let executemany pack each batch into as few statements as the packet size allows
+    cursor.max_stmt_length = connection.max_stmt_length
     
-    print(f'Found {len(events)} events in file')
+    for rows in read_row_batches(filepath, counts):
+        # Savepoint so a failed batch can be undone and retried row by row
+        cursor.execute('SAVEPOINT batch')
+        try:
+            cursor.executemany(INSERT_SQL, rows)
+            success_count += len(rows)
+        except Exception as e:
+            print(f'  [WARNING] Batch ending at event {counts["events"]} failed ({e}); retrying row by row')
+            cursor.execute('ROLLBACK TO SAVEPOINT batch')
+            success_count += insert_rows_individually(cursor, rows, counts)
+        print(f'  Processed {counts["events"]} events...')
     
-    # Insert events
-    cursor = connection.cursor()
+    return success_count
+
+def insert_rows_individually(cursor, rows, counts):
+    """Insert rows one at a time, counting and reporting only the failing ones"""
     success_count = 0
-    error_count = 0
     
-    for idx, event in enumerate(events, 1):
+    for row in rows:
         try:
-            insert_event(cursor, event)
+            cursor.execute(INSERT_SQL, row)
             success_count += 1
-            
-            if idx % 50 == 0:
-                print(f'  Processed {idx}/{len(events)} events...')
+        except Exception as e:
+            counts['errors'] += 1
+            event_id = uuid.UUID(bytes=row[0]) if row[0] else None
+            print(f'  [ERROR] Failed to insert event {event_id}: {e}')
+    
+    return success_count
+
+def report_load_warnings(cursor, filepath, counts):
+    """Record and print the warnings raised by the last LOAD DATA statement"""
+    cursor.execute('SHOW COUNT(*) WARNINGS')
+    warning_count = int(cursor.fetchone()[0])
+    if not warning_count:
+        return
+    
+    counts['warnings'] += warning_count
+    print(f'  [WARNING] LOAD DATA raised {warning_count} warning(s) for {filepath}:')
+    cursor.execute('SHOW WARNINGS LIMIT 5')
+    for level, code, message in cursor.fetchall():
+        print(f'    {level} {code}: {message}')
+
+def load_data_local_infile(cursor, filepath, counts):
+    """Stage events in a TSV file and bulk load it, returning the loaded count"""
+    fd, tsv_path = tempfile.mkstemp(suffix='.tsv')
+    row_count = 0
+    
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as tsv:
+            for rows in read_row_batches(filepath, counts):
+                tsv.writelines(row_to_tsv(row) for row in rows)
+                row_count += len(rows)
+        
+        try:
+            cursor.execute(LOAD_DATA_SQL, (tsv_path,))
+        except Exception as e:
+            if e.args and e.args[0] in LOCAL_INFILE_DISABLED_ERRORS:
+                raise
+            counts['errors'] += row_count
+            print(f'  [ERROR] LOAD DATA failed for {filepath}: {e}')
+            return 0
         
+        # LOCAL implies IGNORE: duplicate rows are skipped and bad values are
+        # coerced (e.g. a malformed timestamp becomes a zero date), with only warnings
+        loaded = cursor.rowcount
+        if loaded < row_count:
+            counts['errors'] += row_count - loaded
+            print(f'  [WARNING] LOAD DATA skipped {row_count - loaded} rows in {filepath}')
+        report_load_warnings(cursor, filepath, counts)
+        print(f'  Processed {counts["events"]} events...')
+        return loaded
+    finally:
+        os.remove(tsv_path)
+
+def load_json_file(filepath, connection, infile_disabled=None):
+    """Load events from a JSON file into database
+    
+    infile_disabled is a threading.Event shared by one loader run; it is set
+    the first time the server rejects LOAD DATA LOCAL INFILE so later files
+    go straight to batched INSERTs.
+    """
+    
+    print(f'\nLoading file: {filepath}')
+    
+    if infile_disabled is None:
+        infile_disabled = threading.Event()
+    
+    # Stream events from the file into the staging table
+    cursor = connection.cursor()
+    counts = {'events': 0, 'errors': 0, 'warnings': 0}
+    
+    success_count = None
+    if LOCAL_INFILE and not infile_disabled.is_set():
+        try:
+            success_count = load_data_local_infile(cursor, filepath, counts)
         except Exception as e:
-            error_count += 1
-            print(f'  [ERROR] Failed to insert event {idx}: {e}')
+            if not (e.args and e.args[0] in LOCAL_INFILE_DISABLED_ERRORS):
+                raise
+            infile_disabled.set()
+            print(f'  [WARNING] LOAD DATA LOCAL INFILE is disabled ({e}); falling back to batched INSERTs')
+            counts = {'events': 0, 'errors': 0, 'warnings': 0}
+    if success_count is None:
+        success_count = insert_rows(connection, cursor, filepath, counts)
+    error_count = counts['errors']
     
-    # Commit transaction
-    connection.commit()
+    print(f'Found {counts["events"]} events in file')
     
     print(f'\n[COMPLETE] Loaded {success_count} events successfully')
     if error_count > 0:
         print(f'[WARNING] {error_count} events failed to load')
+    if counts['warnings'] > 0:
+        print(f'[WARNING] {counts["warnings"]} MySQL warning(s) while loading; rows may hold coerced values')
     
     return success_count, error_count
 
+def load_json_file_in_transaction(filepath, pool, infile_disabled):
+    """Load a file on a pooled connection, committing it as one transaction"""
+    connection = pool.get()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('START TRANSACTION')
+        success, errors = load_json_file(filepath, connection, infile_disabled)
+        
+        # Commit transaction
+        connection.commit()
+        return success, errors
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        pool.put(connection)
+
 def load_all_events(events_dir='data/events'):
     """Load all JSON files from events directory"""
     
@@ -128,33 +380,50 @@ def load_all_events(events_dir='data/events'):
     print('DATA LOADER - JSON to MySQL')
     print('=' * 60)
     
-    # Connect to database
-    connection = get_db_connection()
-    if not connection:
-        return
-    
-    # Find all JSON files
-    json_files = [f for f in os.listdir(events_dir) if f.endswith('.json')]
+    # Find all JSON / JSON Lines files, oldest first
+    with os.scandir(events_dir) as entries:
+        json_files = [entry for entry in entries if entry.is_file() and entry.name.endswith(('.json', '.jsonl'))]
+    json_files.sort(key=lambda entry: entry.stat().st_mtime)
+    filepaths = [entry.path for entry in json_files]
     
     if not json_files:
         print(f'[WARNING] No JSON files found in {events_dir}')
-        connection.close()
         return
     
     print(f'\nFound {len(json_files)} JSON file(s) to process')
     
-    # Load each file
+    # Connect to database, one connection per worker
+    connections = []
+    for _ in range(min(LOADER_WORKERS, len(json_files))):
+        connection = get_db_connection()
+        if not connection:
+            break
+        connections.append(connection)
+    
+    if not connections:
+        return
+    
+    pool = queue.Queue()
+    for connection in connections:
+        pool.put(connection)
+    
+    # Load files in parallel, each inside its own transaction
     total_success = 0
     total_errors = 0
+    infile_disabled = threading.Event()
     
-    for json_file in json_files:
-        filepath = os.path.join(events_dir, json_file)
-        success, errors = load_json_file(filepath, connection)
-        total_success += success
-        total_errors += errors
-    
-    # Close connection
-    connection.close()
+    try:
+        with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+            for success, errors in executor.map(lambda path: load_json_file_in_transaction(path, pool, infile_disabled), filepaths):
+                total_success += success
+                total_errors += errors
+    finally:
+        # Close connections; session settings end with the connection
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception as e:
+                print(f'[WARNING] Could not close connection: {e}')
     
     print('\n' + '=' * 60)
     print(f'[SUMMARY]')